@@ -62,12 +62,12 @@ def build_other_pages(comic_folder, comic_info, comic_data_dicts):
     comic that's currently being built. Use this value if you want to return different global values depending on what
     comic is being built.
     :param comic_info: The current comic's comic_info.ini file parsed into a RawConfigParser object.
-    :param comic_data_dicts: List of comic data dicts that were built during the previous processing steps. Each data
-    dict also contains the global values passed in to all templates when they're built.
+    :param comic_data_dicts: List of comic data dicts that were built during the previous processing steps. The global
+    template values are not included; read them from utils.jinja_environment.globals.
     :return: None
     """
-    # You can use comic_data_dicts[-1] to pass the last comic_data_dict to the template so it can have access to all
-    # the global template variables, as well as the information of the most recent comic page.
+    # You can use comic_data_dicts[-1] to pass the last comic_data_dict to the template so it can have access to the
+    # information of the most recent comic page. The global template variables are always available.
 
     # utils.write_to_template("infinite_scroll", "path/to/html/index.html", comic_data_dicts[-1])
 
@@ -5,17 +5,18 @@ import re
 import shutil
 import sys
 from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from configparser import RawConfigParser
 from copy import deepcopy
-from datetime import datetime
-from glob import glob
+from datetime import datetime, tzinfo
 from importlib import import_module
-from json import dumps
-from time import strptime, time, strftime
-from typing import Dict, List, Tuple, Any, Union
+from json import dump
+from threading import Thread
+from time import time
+from typing import Dict, List, Tuple, Any, Union, Optional, Callable
 
 from PIL import Image
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from markdown2 import Markdown
 from pytz import timezone
 
@@ -31,7 +32,17 @@ If you want to edit any of these files, follow the instructions at https://githu
 -->
 """
 BASE_DIRECTORY = ""
+JINJA_CACHE_DIR = ".jinja_cache"
 MARKDOWN = Markdown(extras=["strike", "break-on-newline"])
+_SECTION_HEADER_RE = re.compile(r"^\s*\[.*?]")
+# Used by read_info() to parse simple info.ini files without the overhead of RawConfigParser
+_KV_RE = re.compile(r"^([^=:\s#;\[][^=:\n]*?)[ \t]*[=:][ \t]*(.*?)[ \t\r]*$", re.M)
+# File extensions recognized by the "Auto-detect comic images" option
+_IMAGE_EXTS = frozenset({"jpg", "jpeg", "png", "tif", "tiff", "gif", "bmp", "webp", "webv", "svg", "eps"})
+# Maps (theme, function name) to the function found in that theme's hooks.py file, or None if there isn't one
+_HOOK_CACHE: Dict[Tuple[str, str], Optional[Callable]] = {}
+# Background thread started by delete_output_file_space() to delete the previous build's comic folder
+_OUTPUT_CLEANUP_THREAD: Optional[Thread] = None
 
 
 def web_path(rel_path: str):
@@ -40,25 +51,59 @@ def web_path(rel_path: str):
     return rel_path
 
 
+def delete_folders(folders: List[str]):
+    for folder in folders:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
 def delete_output_file_space(comic_info: RawConfigParser = None):
-    shutil.rmtree("comic", ignore_errors=True)
-    if os.path.isfile("feed.xml"):
-        os.remove("feed.xml")
+    global _OUTPUT_CLEANUP_THREAD
+    wait_for_output_cleanup()
+    # Pick up any old comic folders left behind by builds that were interrupted before they finished deleting them
+    with os.scandir(".") as it:
+        old_comic_folders = [entry.path for entry in it if entry.name.startswith("comic.old.") and entry.is_dir()]
+    # Move the old comic folder out of the way in one rename, and delete it in the background while the build runs
+    if os.path.isdir("comic"):
+        old_comic_folder = f"comic.old.{os.getpid()}"
+        try:
+            os.replace("comic", old_comic_folder)
+        except OSError:
+            shutil.rmtree("comic", ignore_errors=True)
+        else:
+            old_comic_folders.append(old_comic_folder)
+    if old_comic_folders:
+        _OUTPUT_CLEANUP_THREAD = Thread(target=delete_folders, args=(old_comic_folders,))
+        _OUTPUT_CLEANUP_THREAD.start()
     if comic_info is None:
         comic_info = read_info("comic_info.ini")
+    # Gather everything to delete first, then remove it all without checking whether each path exists
+    files_to_delete = ["feed.xml"]
+    folders_to_delete = []
     for page in get_pages_list(comic_info):
         if page["template_name"] == "index":
-            if os.path.exists("index.html"):
-                os.remove("index.html")
+            files_to_delete.append("index.html")
         elif page["template_name"] == "404":
-            if os.path.exists("404.html"):
-                os.remove("404.html")
+            files_to_delete.append("404.html")
         else:
-            if os.path.exists(page["template_name"]):
-                shutil.rmtree(page["template_name"])
-    for comic in get_extra_comics_list(comic_info):
-        if os.path.exists(comic):
-            shutil.rmtree(comic)
+            folders_to_delete.append(page["template_name"])
+    folders_to_delete.extend(get_extra_comics_list(comic_info))
+    for path in files_to_delete:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    for path in folders_to_delete:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def wait_for_output_cleanup():
+    """
+    Waits for the background deletion started by delete_output_file_space(), if it's still running.
+    """
+    global _OUTPUT_CLEANUP_THREAD
+    if _OUTPUT_CLEANUP_THREAD is not None:
+        _OUTPUT_CLEANUP_THREAD.join()
+        _OUTPUT_CLEANUP_THREAD = None
 
 
 def setup_output_file_space(comic_info: RawConfigParser):
@@ -66,10 +111,39 @@ def setup_output_file_space(comic_info: RawConfigParser):
     delete_output_file_space(comic_info)
 
 
+def parse_simple_info(info_string: str) -> Optional[Dict[str, str]]:
+    """
+    Quickly parses an info.ini file that only has single-line "key = value" or "key: value" options, and no sections.
+    :param info_string: The contents of the info.ini file
+    :return: The options in the file, or None if the file has anything else in it (section headers, multi-line values,
+    duplicate options, lines that aren't options, etc.) and needs to be parsed by RawConfigParser instead.
+    """
+    option_lines = 0
+    for line in info_string.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped[0] in "#;":
+            continue
+        if stripped[0] == "[":
+            return None
+        option_lines += 1
+    options = _KV_RE.findall(info_string)
+    if len(options) != option_lines:
+        return None
+    info_dict = dict(options)
+    if len(info_dict) != len(options):
+        return None
+    return info_dict
+
+
 def read_info(filepath, to_dict=False):
     with open(filepath, "rb") as f:
         info_string = f.read().decode("utf-8")
-    if not re.search(r"^\[.*?]", info_string):
+    if to_dict:
+        info_dict = parse_simple_info(info_string)
+        if info_dict is not None:
+            return info_dict
+    # Files almost always start right at their first section header, so only use the regex for files that don't
+    if not (info_string.startswith("[") or _SECTION_HEADER_RE.match(info_string)):
         # print(filepath + " has no section")
         info_string = "[DEFAULT]\n" + info_string
     info = RawConfigParser()
@@ -120,6 +194,28 @@ def get_extra_comics_list(comic_info: RawConfigParser) -> List[str]:
     return []
 
 
+def get_hook(theme: str, func: str) -> Optional[Callable]:
+    """
+    Determines if the hooks.py file has been added to the given theme, and if that file contains the given function.
+    The result is cached, so the hooks.py file is only looked up once for each theme and function.
+    :param theme: Name of the theme to check in for the hooks.py file
+    :param func: Function name to look up
+    :return: The function, if one was found. Otherwise, None.
+    """
+    key = (theme, func)
+    if key not in _HOOK_CACHE:
+        method = None
+        if os.path.exists(f"{CONTENT_DIR}/themes/{theme}/scripts/hooks.py"):
+            current_path = os.path.abspath(".")
+            if current_path not in sys.path:
+                sys.path.append(current_path)
+                print(f"Path updated: {sys.path}")
+            hooks = import_module(f"{CONTENT_DIR}.themes.{theme}.scripts.hooks")
+            method = getattr(hooks, func, None)
+        _HOOK_CACHE[key] = method
+    return _HOOK_CACHE[key]
+
+
 def run_hook(theme: str, func: str, args: List[Any]) -> Any:
     """
     Determines if the hooks.py file has been added to the given theme, and if that file contains the given function.
@@ -129,22 +225,26 @@ def run_hook(theme: str, func: str, args: List[Any]) -> Any:
     :param args: Args list to pass to the function
     :return: The return value of the function called, if one was found. Otherwise, None.
     """
-    if os.path.exists(f"{CONTENT_DIR}/themes/{theme}/scripts/hooks.py"):
-        current_path = os.path.abspath(".")
-        if current_path not in sys.path:
-            sys.path.append(current_path)
-            print(f"Path updated: {sys.path}")
-        hooks = import_module(f"{CONTENT_DIR}.themes.{theme}.scripts.hooks")
-        if hasattr(hooks, func):
-            method = getattr(hooks, func)
-            return method(*args)
+    method = get_hook(theme, func)
+    if method is not None:
+        return method(*args)
     return None
 
 
 def build_and_publish_comic_pages(comic_url: str, comic_folder: str, comic_info: RawConfigParser,
                                   delete_scheduled_posts: bool, publish_all_comics: bool, processing_times: list):
+    # Read the settings used for every page once, instead of re-reading them from comic_info for each page
+    theme = get_option(comic_info, "Comic Settings", "Theme", default="default")
+    date_format = comic_info.get("Comic Settings", "Date format")
+    archive_date_format = comic_info.get("Archive", "Date format")
+    tz_info = timezone(comic_info.get("Comic Settings", "Timezone"))
+    auto_detect_comic_images = get_option(
+        comic_info, "Comic Settings", "Auto-detect comic images", option_type=bool, default=False
+    )
+
     page_info_list, scheduled_post_count = get_page_info_list(
-        comic_folder, comic_info, delete_scheduled_posts, publish_all_comics
+        comic_folder, comic_info, delete_scheduled_posts, publish_all_comics, theme, date_format, tz_info,
+        auto_detect_comic_images
     )
     print([p["page_name"] for p in page_info_list])
     processing_times.append((f"Get info for all pages in '{comic_folder}'", time()))
@@ -153,8 +253,19 @@ def build_and_publish_comic_pages(comic_url: str, comic_folder: str, comic_info:
     save_page_info_json_file(comic_folder, page_info_list, scheduled_post_count)
     processing_times.append((f"Save page_info_list.json file in '{comic_folder}'", time()))
 
+    # Load the text that's shown before and after every page's post text
+    before_post_text = read_post_text_files(comic_folder, "before post text")
+    after_post_text = read_post_text_files(comic_folder, "after post text")
+
+    # Find the transcript files for all pages at once
+    transcript_index = get_transcript_index(comic_folder, comic_info)
+    default_transcript_language = get_option(comic_info, "Transcripts", "Default language", default=f"English")
+
     # Build full comic data dicts, to build templates with
-    comic_data_dicts = build_comic_data_dicts(comic_folder, comic_info, page_info_list)
+    comic_data_dicts = build_comic_data_dicts(
+        comic_folder, comic_info, page_info_list, theme, archive_date_format, before_post_text, after_post_text,
+        transcript_index, default_transcript_language
+    )
     processing_times.append((f"Build full comic data dicts for '{comic_folder}'", time()))
 
     # Create low-res and thumbnail versions of all the comic pages
@@ -179,7 +290,7 @@ def build_and_publish_comic_pages(comic_url: str, comic_folder: str, comic_info:
         "banner_image": web_path(
             get_option(comic_info, "Comic Settings", "Banner image", default=f"/{CONTENT_DIR}/images/banner.png")
         ),
-        "theme": get_option(comic_info, "Comic Settings", "Theme", default="default"),
+        "theme": theme,
         "comic_url": comic_url,
         "base_dir": BASE_DIRECTORY,
         "comic_base_dir": f"{BASE_DIRECTORY}/{comic_folder}".rstrip("/"),  # e.g. /base_dir/extra_comic
@@ -200,30 +311,47 @@ def build_and_publish_comic_pages(comic_url: str, comic_folder: str, comic_info:
     )
     if extra_global_variables:
         global_values.update(extra_global_variables)
-    write_html_files(comic_folder, comic_info, comic_data_dicts, global_values)
+    else:
+        extra_global_variables = {}
+    write_html_files(comic_folder, comic_info, comic_data_dicts, global_values, extra_global_variables)
     processing_times.append((f"Write HTML files for '{comic_folder}'", time()))
     return comic_data_dicts
 
 
 def get_page_info_list(comic_folder: str, comic_info: RawConfigParser, delete_scheduled_posts: bool,
-                       publish_all_comics: bool) -> Tuple[List[Dict], int]:
-    date_format = comic_info.get("Comic Settings", "Date format")
-    tz_info = timezone(comic_info.get("Comic Settings", "Timezone"))
+                       publish_all_comics: bool, theme: str, date_format: str, tz_info: tzinfo,
+                       auto_detect_comic_images: bool) -> Tuple[List[Dict], int]:
     local_time = datetime.now(tz=tz_info)
     print(f"Local time is {local_time}")
     page_info_list = []
     scheduled_post_count = 0
-    auto_detect_comic_images = get_option(
-        comic_info, "Comic Settings", "Auto-detect comic images", option_type=bool, default=False
-    )
-    theme = get_option(comic_info, "Comic Settings", "Theme", default="default")
-    for page_path in glob(f"{CONTENT_DIR}/{comic_folder}comics/*/"):
-        filepath = f"{page_path}info.ini"
-        if not os.path.exists(f"{page_path}info.ini"):
+    try:
+        with os.scandir(f"{CONTENT_DIR}/{comic_folder}comics") as it:
+            page_entries = [entry for entry in it if not entry.name.startswith(".") and entry.is_dir()]
+    except FileNotFoundError:
+        page_entries = []
+    for page_entry in page_entries:
+        page_path = page_entry.path + "/"
+        # List the page folder once, both to find its info.ini file and to auto-detect its comic image
+        has_info_ini = False
+        image_files = []
+        with os.scandir(page_entry.path) as it:
+            for entry in it:
+                filename = entry.name
+                if filename == "info.ini":
+                    has_info_ini = True
+                elif filename == "thumbnail.jpg":
+                    continue
+                else:
+                    _, dot, extension = filename.rpartition(".")
+                    if dot and extension.lower() in _IMAGE_EXTS:
+                        image_files.append(filename)
+        if not has_info_ini:
             print(f"{page_path} is missing its info.ini file. Skipping")
             continue
-        page_info = read_info(filepath, to_dict=True)
-        post_date = tz_info.localize(datetime.strptime(page_info["Post date"], date_format))
+        page_info = read_info(f"{page_path}info.ini", to_dict=True)
+        post_date_text = page_info["Post date"]
+        post_date = tz_info.localize(datetime.strptime(post_date_text, date_format))
         if post_date > local_time and not publish_all_comics:
             scheduled_post_count += 1
             # Post date is in the future, so delete the folder with the resources
@@ -234,12 +362,6 @@ def get_page_info_list(comic_folder: str, comic_info: RawConfigParser, delete_sc
             if not page_info.get("Filename", ""):
                 if not auto_detect_comic_images:
                     raise FileNotFoundError(f"Comic image filename must be provided in {page_path}info.ini")
-                image_files = []
-                for filename in os.listdir(page_path):
-                    if filename == "thumbnail.jpg":
-                        continue
-                    if re.search(r"\.(jpg|jpeg|png|tif|tiff|gif|bmp|webp|webv|svg|eps)$", filename):
-                        image_files.append(filename)
                 if len(image_files) != 1:
                     raise FileNotFoundError(
                         f"Found {len(image_files)} images when attempting to auto-detect image files in {page_path}. "
@@ -248,7 +370,7 @@ def get_page_info_list(comic_folder: str, comic_info: RawConfigParser, delete_sc
                         f"(thumbnail.jpg)."
                     )
                 page_info["Filename"] = image_files[0]
-            page_info["page_name"] = os.path.basename(os.path.normpath(page_path))
+            page_info["page_name"] = page_entry.name
             page_info["Storyline"] = page_info.get("Storyline", "")
             page_info["Characters"] = utils.str_to_list(page_info.get("Characters", ""))
             page_info["Tags"] = utils.str_to_list(page_info.get("Tags", ""))
@@ -256,24 +378,32 @@ def get_page_info_list(comic_folder: str, comic_info: RawConfigParser, delete_sc
                                    [comic_folder, comic_info, page_path, page_info])
             if hook_result:
                 page_info = hook_result
+            # Keep the parsed date around, so the post date never has to be parsed again. This is set after the hook
+            # runs, in case the hook changed the post date or returned a new dict.
+            if page_info["Post date"] != post_date_text:
+                post_date = tz_info.localize(datetime.strptime(page_info["Post date"], date_format))
+            page_info["_post_dt"] = post_date
             print(page_info)
             page_info_list.append(page_info)
 
     page_info_list = sorted(
         page_info_list,
-        key=lambda x: (strptime(x["Post date"], date_format), x["page_name"])
+        key=lambda x: (x["_post_dt"], x["page_name"])
     )
     return page_info_list, scheduled_post_count
 
 
 def save_page_info_json_file(comic_folder: str, page_info_list: List, scheduled_post_count: int):
     d = {
-        "page_info_list": page_info_list,
+        # Leave out private values, like the parsed post date, that can't be serialized to JSON
+        "page_info_list": [{k: v for k, v in page_info.items() if not k.startswith("_")}
+                           for page_info in page_info_list],
         "scheduled_post_count": scheduled_post_count
     }
     os.makedirs(f"{comic_folder}comic", exist_ok=True)
-    with open(f"{comic_folder}comic/page_info_list.json", "w") as f:
-        f.write(dumps(d))
+    # Stream the JSON straight into the file, instead of building the whole string in memory first
+    with open(f"{comic_folder}comic/page_info_list.json", "w", buffering=1 << 20) as f:
+        dump(d, f, separators=(",", ":"))
 
 
 def get_ids(comic_list: List[Dict], index):
@@ -286,49 +416,85 @@ def get_ids(comic_list: List[Dict], index):
     }
 
 
-def get_transcripts(comic_folder: str, comic_info: RawConfigParser, page_name: str) -> OrderedDict:
+def get_transcript_index(comic_folder: str, comic_info: RawConfigParser) -> Dict[str, List[str]]:
+    """
+    Finds the transcript files for every page in the comic up front, so each page doesn't have to search for its own.
+    :param comic_folder: The folder of the comic being built, or blank for the main comic
+    :param comic_info: The comic_info.ini file of the comic being built
+    :return: Dict mapping each page name to the paths of its transcript files, in the order they should be loaded
+    """
+    transcript_index = defaultdict(list)
     if not comic_info.getboolean("Transcripts", "Enable transcripts"):
-        return OrderedDict()
-    transcripts = OrderedDict()
+        return transcript_index
     if get_option(comic_info, "Transcripts", "Load transcripts from comic folder", option_type=bool, default=True):
-        load_transcripts_from_folder(transcripts, f"{CONTENT_DIR}/{comic_folder}comics", page_name)
+        index_transcripts_folder(transcript_index, f"{CONTENT_DIR}/{comic_folder}comics")
     transcripts_dir = get_option(comic_info, "Transcripts", "Transcripts folder", default=f"")
     if transcripts_dir:
-        load_transcripts_from_folder(transcripts, transcripts_dir, page_name)
-    default_language = get_option(comic_info, "Transcripts", "Default language", default=f"English")
+        index_transcripts_folder(transcript_index, transcripts_dir)
+    return transcript_index
+
+
+def index_transcripts_folder(transcript_index: Dict[str, List[str]], transcripts_dir: str):
+    try:
+        with os.scandir(transcripts_dir) as it:
+            page_entries = [entry for entry in it if not entry.name.startswith(".") and entry.is_dir()]
+    except FileNotFoundError:
+        return
+    for page_entry in page_entries:
+        # Filter out post.txt while scanning, so only the transcripts themselves are sorted and indexed
+        with os.scandir(page_entry.path) as it:
+            entries = sorted(
+                (entry for entry in it if entry.name.endswith(".txt") and entry.name != "post.txt"
+                 and not entry.name.startswith(".") and entry.is_file()),
+                key=lambda entry: entry.name
+            )
+        transcript_index[page_entry.name].extend(entry.path for entry in entries)
+
+
+def get_transcripts(transcript_paths: List[str], default_language: str) -> OrderedDict:
+    transcripts = OrderedDict()
+    for transcript_path in transcript_paths:
+        language = os.path.basename(transcript_path)[:-len(".txt")]
+        with open(transcript_path, "rb") as f:
+            transcript = f.read().decode("utf-8")
+        transcripts[language] = MARKDOWN.convert(transcript) if transcript.strip() else ""
     if default_language in transcripts:
         transcripts.move_to_end(default_language, last=False)
     return transcripts
 
 
-def load_transcripts_from_folder(transcripts: OrderedDict, transcripts_dir: str, page_name: str):
-    for transcript_path in sorted(glob(os.path.join(transcripts_dir, page_name, "*.txt"))):
-        if transcript_path.endswith("post.txt"):
-            continue
-        language = os.path.splitext(os.path.basename(transcript_path))[0]
-        with open(transcript_path, "rb") as f:
-            transcripts[language] = MARKDOWN.convert(f.read().decode("utf-8"))
+def read_post_text_files(comic_folder: str, file_name: str) -> List[str]:
+    """
+    Reads the *.txt and *.html versions of a post text file that's shared by every page in a comic, e.g.
+    "before post text.txt" and "before post text.html".
+    :param comic_folder: The folder of the comic being built, or blank for the main comic
+    :param file_name: The name of the post text file, without its extension
+    :return: The contents of each of the files that exist
+    """
+    post_text = []
+    for ext in (".txt", ".html"):
+        post_text_path = f"{CONTENT_DIR}/{comic_folder}{file_name}{ext}"
+        if os.path.exists(post_text_path):
+            with open(post_text_path, "rb") as f:
+                post_text.append(f.read().decode("utf-8"))
+    return post_text
 
 
-def create_comic_data(comic_folder: str, comic_info: RawConfigParser, page_info: dict,
-                      first_id: str, previous_id: str, current_id: str, next_id: str, last_id: str):
+def create_comic_data(comic_folder: str, comic_info: RawConfigParser, page_info: dict, theme: str,
+                      archive_date_format: str, before_post_text: List[str], after_post_text: List[str],
+                      transcript_index: Dict[str, List[str]], default_language: str, first_id: str,
+                      previous_id: str, current_id: str, next_id: str, last_id: str):
     print("Building page {}...".format(page_info["page_name"]))
     page_dir = f"{CONTENT_DIR}/{comic_folder}comics/{page_info['page_name']}/"
-    archive_post_date = strftime(comic_info.get("Archive", "Date format"),
-                                 strptime(page_info["Post date"], comic_info.get("Comic Settings", "Date format")))
-    post_html = []
-    post_text_paths = [
-        f"{CONTENT_DIR}/{comic_folder}before post text.txt",
-        f"{CONTENT_DIR}/{comic_folder}before post text.html",
-        page_dir + "post.txt",
-        f"{CONTENT_DIR}/{comic_folder}after post text.txt",
-        f"{CONTENT_DIR}/{comic_folder}after post text.html",
-    ]
-    for post_text_path in post_text_paths:
-        if os.path.exists(post_text_path):
-            with open(post_text_path, "rb") as f:
-                post_html.append(f.read().decode("utf-8"))
-    post_html = MARKDOWN.convert("\n\n".join(post_html))
+    archive_post_date = page_info["_post_dt"].strftime(archive_date_format)
+    post_html = before_post_text.copy()
+    if os.path.exists(page_dir + "post.txt"):
+        with open(page_dir + "post.txt", "rb") as f:
+            post_html.append(f.read().decode("utf-8"))
+    post_html.extend(after_post_text)
+    post_text = "\n\n".join(post_html)
+    # Don't run the Markdown converter over pages that have no post text at all
+    post_html = MARKDOWN.convert(post_text) if post_text.strip() else ""
     d = {
         "page_name": page_info["page_name"],
         "filename": page_info["Filename"],
@@ -347,9 +513,8 @@ def create_comic_data(comic_folder: str, comic_info: RawConfigParser, page_info:
         "characters": page_info["Characters"],
         "tags": page_info["Tags"],
         "post_html": post_html,
-        "transcripts": get_transcripts(comic_folder, comic_info, page_info["page_name"]),
+        "transcripts": get_transcripts(transcript_index.get(page_info["page_name"], []), default_language),
     }
-    theme = get_option(comic_info, "Comic Settings", "Theme", default="default")
     hook_result = run_hook(theme, "extra_comic_dict_processing", [comic_folder, comic_info, d])
     if hook_result:
         d = hook_result
@@ -357,15 +522,18 @@ def create_comic_data(comic_folder: str, comic_info: RawConfigParser, page_info:
     return d
 
 
-def build_comic_data_dicts(comic_folder: str, comic_info: RawConfigParser, page_info_list: List[Dict]) -> List[Dict]:
+def build_comic_data_dicts(comic_folder: str, comic_info: RawConfigParser, page_info_list: List[Dict], theme: str,
+                           archive_date_format: str, before_post_text: List[str], after_post_text: List[str],
+                           transcript_index: Dict[str, List[str]], default_language: str) -> List[Dict]:
     return [
-        create_comic_data(comic_folder, comic_info, page_info, **get_ids(page_info_list, i))
+        create_comic_data(comic_folder, comic_info, page_info, theme, archive_date_format, before_post_text,
+                          after_post_text, transcript_index, default_language, **get_ids(page_info_list, i))
         for i, page_info in enumerate(page_info_list)
     ]
 
 
-def resize(im, size):
-    im_w, im_h = im.size
+def get_resized_dimensions(im_size: Tuple[int, int], size: str) -> Tuple[int, int]:
+    im_w, im_h = im_size
     if "," in size:
         # Convert a string of the form "100, 36" into a 2-tuple of ints (100, 36)
         w, h = size.strip().split(",")
@@ -385,7 +553,17 @@ def resize(im, size):
         h = im_h / im_w * w
     else:
         raise ValueError("Unknown resize value: {!r}".format(size))
-    return im.resize((int(w), int(h)))
+    return int(w), int(h)
+
+
+def resize(im, size):
+    im_w, im_h = im.size
+    w, h = get_resized_dimensions(im.size, size)
+    if im.format == "JPEG" and im_w >= 4 * w:
+        # For big downscales, let libjpeg decode the image at a reduced scale first. This skips most of the decoding
+        # work, and the final resize below still has twice the target resolution to work with.
+        im.draft("RGB", (w * 2, h * 2))
+    return im.resize((w, h), resample=Image.LANCZOS)
 
 
 def save_image(im, path):
@@ -405,24 +583,56 @@ def save_image(im, path):
             raise
 
 
-def process_comic_image(comic_info, comic_page_path):
-    section = "Image Reprocessing"
+def process_comic_image(thumbnail_size: str, overwrite_existing_images: bool, comic_page_path: str):
     comic_page_dir = os.path.dirname(comic_page_path)
     comic_page_name, comic_page_ext = os.path.splitext(os.path.basename(comic_page_path))
-    with open(comic_page_path, "rb") as f:
-        im = Image.open(f)
-        thumbnail_path = os.path.join(comic_page_dir, "thumbnail.jpg")
-        if comic_info.getboolean(section, "Overwrite existing images") or not os.path.isfile(thumbnail_path):
-            print(f"Creating thumbnail for {comic_page_name}")
-            thumb_im = resize(im, comic_info.get(section, "Thumbnail size"))
-            save_image(thumb_im, thumbnail_path)
+    thumbnail_path = os.path.join(comic_page_dir, "thumbnail.jpg")
+    if os.path.isfile(thumbnail_path) and not overwrite_existing_images:
+        return
+    # Opening an image only reads its header, so the sizes can be compared before any decoding is done
+    with Image.open(comic_page_path) as im:
+        # Skip pages whose thumbnails were made after the page was last changed, and with the current thumbnail size
+        if os.path.isfile(thumbnail_path) and os.path.getmtime(thumbnail_path) >= os.path.getmtime(comic_page_path):
+            try:
+                with Image.open(thumbnail_path) as thumb_im:
+                    thumbnail_up_to_date = thumb_im.size == get_resized_dimensions(im.size, thumbnail_size)
+            except OSError:
+                thumbnail_up_to_date = False
+            if thumbnail_up_to_date:
+                return
+        # Flush right away, since output buffered in a worker process can be lost when the pool shuts down
+        print(f"Creating thumbnail for {comic_page_name}", flush=True)
+        thumb_im = resize(im, thumbnail_size)
+        save_image(thumb_im, thumbnail_path)
 
 
 def process_comic_images(comic_info: RawConfigParser, comic_data_dicts: List[Dict]):
     section = "Image Reprocessing"
     if comic_info.getboolean(section, "Create thumbnails"):
-        for comic_data in comic_data_dicts:
-            process_comic_image(comic_info, comic_data["comic_path"])
+        # Read the settings once here, so the worker processes only get sent plain, picklable values
+        thumbnail_size = comic_info.get(section, "Thumbnail size")
+        overwrite_existing_images = comic_info.getboolean(section, "Overwrite existing images")
+        # Leave out pages that already have thumbnails we won't overwrite, which is usually all of them
+        comic_page_paths = [
+            comic_data["comic_path"] for comic_data in comic_data_dicts
+            if overwrite_existing_images or not os.path.isfile(comic_data["thumbnail_path"])
+        ]
+        if len(comic_page_paths) <= 1:
+            # Not worth starting any worker processes for
+            for comic_page_path in comic_page_paths:
+                process_comic_image(thumbnail_size, overwrite_existing_images, comic_page_path)
+            return
+        # Don't fork worker processes while the old comic folder is still being deleted on another thread
+        wait_for_output_cleanup()
+        # Each page is resized independently, so spread the work out over all available cores
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            list(executor.map(
+                process_comic_image,
+                [thumbnail_size] * len(comic_page_paths),
+                [overwrite_existing_images] * len(comic_page_paths),
+                comic_page_paths,
+                chunksize=4
+            ))
 
 
 def get_storylines(comic_data_dicts: List[Dict], show_uncategorized: bool) -> OrderedDict:
@@ -437,37 +647,56 @@ def get_storylines(comic_data_dicts: List[Dict], show_uncategorized: bool) -> Or
             storyline = "Uncategorized"
         if storyline not in storylines_dict.keys():
             storylines_dict[storyline] = []
-        storylines_dict[storyline].append(comic_data.copy())
+        # Templates only read from these dicts, so there's no need to copy them
+        storylines_dict[storyline].append(comic_data)
     if "Uncategorized" in storylines_dict:
         storylines_dict.move_to_end("Uncategorized")
     return storylines_dict
 
 
-def write_html_files(comic_folder: str, comic_info: RawConfigParser, comic_data_dicts: List[Dict], global_values: Dict):
+def write_html_files(comic_folder: str, comic_info: RawConfigParser, comic_data_dicts: List[Dict], global_values: Dict,
+                     extra_global_values: Dict):
     # Load Jinja environment
     template_folders = ["src/templates"]
     theme = get_option(comic_info, "Comic Settings", "Theme", default="default")
     if theme:
         template_folders.insert(0, f"{CONTENT_DIR}/themes/{theme}/templates")
     print(f"Template folders: {template_folders}")
-    utils.jinja_environment = Environment(loader=FileSystemLoader(template_folders))
+    # Cache compiled templates on disk, so they don't have to be compiled again on the next build
+    os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+    utils.jinja_environment = Environment(
+        loader=FileSystemLoader(template_folders),
+        bytecode_cache=FileSystemBytecodeCache(JINJA_CACHE_DIR),
+        auto_reload=False,
+    )
+    # Install the global values once, so every template can use them without merging them into each page's data.
+    # Values from the extra_global_values hook are still merged in, because they've always overridden page values
+    # with the same name, and Jinja globals can't override the values passed in to render().
+    utils.jinja_environment.globals.update(global_values)
     # Write individual comic pages
     print("Writing {} comic pages...".format(len(comic_data_dicts)))
-    for comic_data_dict in comic_data_dicts:
+    comic_template = utils.get_template("comic")
+
+    def write_comic_page(comic_data_dict: Dict):
         html_path = f"{comic_folder}comic/{comic_data_dict['page_name']}/index.html"
-        comic_data_dict.update(global_values)
-        utils.write_to_template("comic", html_path, comic_data_dict)
-    write_other_pages(comic_folder, comic_info, comic_data_dicts, global_values)
+        if extra_global_values:
+            comic_data_dict = {**comic_data_dict, **extra_global_values}
+        utils.write_to_template(comic_template, html_path, comic_data_dict)
+
+    # The template is already loaded, so rendering and writing the pages can safely overlap across threads
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        list(executor.map(write_comic_page, comic_data_dicts))
+    write_other_pages(comic_folder, comic_info, comic_data_dicts, extra_global_values)
     run_hook(global_values["theme"], "build_other_pages", [comic_folder, comic_info, comic_data_dicts])
 
 
 def write_other_pages(comic_folder: str, comic_info: RawConfigParser, comic_data_dicts: List[Dict],
-                      global_values: Dict):
+                      extra_global_values: Dict):
     last_comic_page = comic_data_dicts[-1] if comic_data_dicts else {}
     pages_list = get_pages_list(comic_info)
     for page in pages_list:
         if page["template_name"] == "tagged":
-            write_tagged_pages(comic_data_dicts, global_values)
+            write_tagged_pages(comic_data_dicts, extra_global_values)
             continue
         if page["template_name"].lower() in ("index", "404"):
             html_path = f"{page['template_name']}.html"
@@ -482,26 +711,28 @@ def write_other_pages(comic_folder: str, comic_info: RawConfigParser, comic_data
         data_dict.update(last_comic_page)
         if page["title"]:
             data_dict["page_title"] = page["title"]
-        data_dict.update(global_values)
+        data_dict.update(extra_global_values)
         utils.write_to_template(page["template_name"], html_path, data_dict)
 
 
-def write_tagged_pages(comic_data_dicts: List[Dict], global_values: Dict):
+def write_tagged_pages(comic_data_dicts: List[Dict], extra_global_values: Dict):
     if not comic_data_dicts:
         return
-    tags = defaultdict(list)
-    for page in comic_data_dicts:
-        for character in page.get("characters", []):
-            tags[character].append(page)
-        for tag in page.get("tags", []):
-            tags[tag].append(page)
-    for tag, pages in tags.items():
+    tagged_template = utils.get_template("tagged")
+    # Index each tag by the positions of its pages, and only build the list of page dicts when it's written
+    tag_indices = defaultdict(list)
+    for i, page in enumerate(comic_data_dicts):
+        for character in page.get("characters") or ():
+            tag_indices[character].append(i)
+        for tag in page.get("tags") or ():
+            tag_indices[tag].append(i)
+    for tag, indices in tag_indices.items():
         data_dict = {
             "tag": tag,
-            "tagged_pages": pages
+            "tagged_pages": [comic_data_dicts[i] for i in indices]
         }
-        data_dict.update(global_values)
-        utils.write_to_template("tagged", f"tagged/{tag}/index.html", data_dict)
+        data_dict.update(extra_global_values)
+        utils.write_to_template(tagged_template, f"tagged/{tag}/index.html", data_dict)
 
 
 def get_extra_comic_info(folder_name: str, comic_info: RawConfigParser):
@@ -574,6 +805,8 @@ def main(delete_scheduled_posts=False, publish_all_comics=False):
 
     processing_times.append(("Postprocessing hook", time()))
 
+    wait_for_output_cleanup()
+
     print_processing_times(processing_times)
 
 
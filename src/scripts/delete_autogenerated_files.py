@@ -1,9 +1,12 @@
+import shutil
+
 try:
-    from src.scripts.build_site import delete_output_file_space
+    from src.scripts.build_site import JINJA_CACHE_DIR, delete_output_file_space
 except ImportError:
     # Some people have issues with the above import. Try this one as well, just to see if it works.
-    from build_site import delete_output_file_space
+    from build_site import JINJA_CACHE_DIR, delete_output_file_space
 from utils import find_project_root
 
-find_project_root()
+find_project_root("comic_info.ini")
 delete_output_file_space()
+shutil.rmtree(JINJA_CACHE_DIR, ignore_errors=True)
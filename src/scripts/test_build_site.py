@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from PIL import Image
+
+import build_site
+
+
+class TestProcessComicImage(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.comic_page_path = os.path.join(self.folder, "Page_1.png")
+        self.thumbnail_path = os.path.join(self.folder, "thumbnail.jpg")
+        Image.new("RGB", (1000, 1500), "white").save(self.comic_page_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def get_thumbnail_color(self):
+        with Image.open(self.thumbnail_path) as im:
+            return im.convert("RGB").getpixel((0, 0))
+
+    def test_overwrite_rebuilds_thumbnail_for_replaced_page_of_same_size(self):
+        build_site.process_comic_image("10%", True, self.comic_page_path)
+        self.assertEqual(self.get_thumbnail_color(), (255, 255, 255))
+        # Replace the page with one of the same size, and make sure it's newer than the thumbnail
+        Image.new("RGB", (1000, 1500), "red").save(self.comic_page_path)
+        later = time.time() + 10
+        os.utime(self.comic_page_path, (later, later))
+        build_site.process_comic_image("10%", True, self.comic_page_path)
+        red, green, blue = self.get_thumbnail_color()
+        self.assertGreater(red, 200)
+        self.assertLess(green, 50)
+
+    def test_overwrite_rebuilds_thumbnail_when_thumbnail_size_changes(self):
+        build_site.process_comic_image("10%", True, self.comic_page_path)
+        build_site.process_comic_image("50w", True, self.comic_page_path)
+        with Image.open(self.thumbnail_path) as im:
+            self.assertEqual(im.size, (50, 75))
+
+    def test_overwrite_skips_up_to_date_thumbnail(self):
+        build_site.process_comic_image("10%", True, self.comic_page_path)
+        thumbnail_mtime = os.path.getmtime(self.thumbnail_path)
+        build_site.process_comic_image("10%", True, self.comic_page_path)
+        self.assertEqual(os.path.getmtime(self.thumbnail_path), thumbnail_mtime)
+
+    def test_no_overwrite_keeps_existing_thumbnail(self):
+        build_site.process_comic_image("10%", False, self.comic_page_path)
+        build_site.process_comic_image("50w", False, self.comic_page_path)
+        with Image.open(self.thumbnail_path) as im:
+            self.assertEqual(im.size, (100, 150))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,8 @@
 import os
 from configparser import RawConfigParser
-from typing import List, Dict
+from typing import List, Dict, Union
 
-from jinja2 import TemplateNotFound
+from jinja2 import Template, TemplateNotFound
 
 jinja_environment = None
 
@@ -68,33 +68,52 @@ def find_project_root(content):
                                     "running this script from within the comic_git repository.")
 
 
-def write_to_template(template_name: str, html_path: str, data_dict: Dict=None) -> None:
+def get_template(template_name: str) -> Template:
     """
     Searches for either an HTML or a TPL file named <template_name> in first the "templates" folder of your
-    theme directory, or the /src/templates directory. It then builds that template at the specified <html_path> using
-    the given <data_dict> as a list of variables to pass into the template when it's rendered.
- 
+    theme directory, or the /src/templates directory, and loads it. Pass the result to write_to_template() when you
+    want to build the same template many times without looking it up again.
+
     :param template_name: The name of the template file or HTML file you wish to load
-    :param html_path: The path to write the HTML file, relative to the repository root. If you want it to write to a 
-    directory (e.g. ...github.io/comic_git/cool_stuff/), then add index.html file at the end.
-    (e.g. "cool_stuff/index.html")
-    :param data_dict: The dictionary of values to pass to the template when it's rendered.
-    :return: None
+    :return: The loaded template
     """
     if jinja_environment is None:
-        raise RuntimeError("Jinja environment was not initialized before write_to_template was called.")
+        raise RuntimeError("Jinja environment was not initialized before get_template was called.")
     try:
-        file_contents = jinja_environment.get_template(template_name + ".html").render()
+        return jinja_environment.get_template(template_name + ".html")
     except TemplateNotFound:
         # If a matching *.html file can't be found, try to find a matching *.tpl file
         try:
-            template = jinja_environment.get_template(template_name + ".tpl")
-            if data_dict is None:
-                data_dict = {}
-            file_contents = template.render(**data_dict)
+            return jinja_environment.get_template(template_name + ".tpl")
         except TemplateNotFound:
             raise TemplateNotFound(f"Template matching '{template_name}' not found")
 
+
+def write_to_template(template_name: Union[str, Template], html_path: str, data_dict: Dict=None) -> None:
+    """
+    Loads the template named <template_name> using get_template(), then builds it at the specified <html_path> using
+    the given <data_dict> as a list of variables to pass into the template when it's rendered.
+ 
+    :param template_name: The name of the template file or HTML file you wish to load, or a template already loaded
+    by get_template()
+    :param html_path: The path to write the HTML file, relative to the repository root. If you want it to write to a 
+    directory (e.g. ...github.io/comic_git/cool_stuff/), then add index.html file at the end.
+    (e.g. "cool_stuff/index.html")
+    :param data_dict: The dictionary of values to pass to the template when it's rendered.
+    :return: None
+    """
+    if isinstance(template_name, Template):
+        template = template_name
+    else:
+        template = get_template(template_name)
+    # HTML files are built as-is. Templates built outside the Jinja environment have no name, so treat them as TPL files
+    if template.name is not None and template.name.endswith(".html"):
+        file_contents = template.render()
+    else:
+        if data_dict is None:
+            data_dict = {}
+        file_contents = template.render(**data_dict)
+
     dir_name = os.path.dirname(html_path)
     if dir_name:
         os.makedirs(dir_name, exist_ok=True)